@@ -1,10 +1,20 @@
-from flask import Flask, request, session, redirect, jsonify, render_template
+from flask import Flask, Response, request, session, redirect, jsonify, render_template
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import secrets
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import re
+import csv
+import io
 from datetime import datetime
 import hashlib
+import hmac
+import gzip
+import zlib
 import uuid
 from utils import (
     validate_username, validate_email, validate_password,
@@ -12,19 +22,73 @@ from utils import (
     format_currency, safe_int, safe_float, truncate_text, is_safe_url
 )
 import logging
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 import time
+import threading
+import heapq
 from functools import wraps
+from collections import deque
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    # Fallback to Flask's stdlib json provider if orjson not available
+    orjson = None
+
+try:
+    import psutil
+    # Prime the CPU counter so later non-blocking reads measure since the previous call
+    psutil.cpu_percent(interval=None)
+except ImportError:
+    # System stats endpoint reports monitoring as unavailable
+    psutil = None
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that encodes jsonify() responses with orjson"""
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.option)
+        return self._app.response_class(body, mimetype='application/json')
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
+# Deployed behind one reverse proxy; trust its X-Forwarded-For so remote_addr is the real client
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+if orjson:
+    app.json = OrjsonProvider(app)
+else:
+    # Never pretty-print or sort keys, even when running with debug=True
+    app.json.compact = True
+    app.json.sort_keys = False
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
 
-# Setup basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(name)s %(message)s'
-)
+# Setup basic logging; the calling thread only interpolates the message (msg % args and any
+# traceback), while a background thread adds timestamp/level and writes to stderr
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+queue_handler = QueueHandler(log_queue)
+# Bare message only; without this basicConfig would prepend its own level/name prefix too
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+log_listener = QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
+api_logger = logging.getLogger(f'{__name__}.api')
 
 # Legacy admin credentials for backward compatibility
 ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
@@ -32,23 +96,71 @@ ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
 
 # Etsy API Configuration
 ETSY_API_KEY = os.environ.get('ETSY_API_KEY', 'your-etsy-api-key')
+ETSY_DEMO_MODE = not ETSY_API_KEY or ETSY_API_KEY == 'your-etsy-api-key'
 ETSY_BASE_URL = 'https://openapi.etsy.com/v3'
+ETSY_LISTINGS_URL = f'{ETSY_BASE_URL}/application/listings/active'
+ETSY_TIMEOUT = (2, 8)  # (connect, read) seconds
+
+# Query parameters shared by every listings search
+ETSY_LISTING_PARAMS = {
+    'includes': 'Images,Shop,User,Translations',
+    'sort_on': 'created',
+    'sort_order': 'desc'
+}
+
+# Shared HTTP session so Etsy calls reuse pooled keep-alive connections
+etsy_session = requests.Session()
+etsy_session.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        # Don't retry read timeouts: a stalled term would pay the read timeout three times
+        # (read=False also re-raises them as Timeout rather than ConnectionError)
+        read=False,
+        backoff_factor=0.25,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({'GET'}),
+        # Etsy's Retry-After can be a minute or more; never sleep that long inside a request
+        respect_retry_after_header=False,
+        raise_on_status=False  # Hand the final response to raise_for_status for logging
+    )
+))
+etsy_session.headers.update({
+    'x-api-key': ETSY_API_KEY,
+    'Authorization': f'Bearer {ETSY_API_KEY}'
+})
+
+# Shared worker pool for fanning out per-search-term Etsy calls
+etsy_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='etsy')
+
+# Search terms every new account starts with
+DEFAULT_USER_SEARCH_TERMS = (
+    "nursery wall art uk",
+    "personalised baby gifts",
+    "custom name sign uk",
+    "wooden name plaque",
+    "baby room decor uk"
+)
+
+# PBKDF2 work factor; raise it as hardware gets faster
+PASSWORD_HASH_ITERATIONS = 600000
+
+def hash_password(password):
+    """Hash password with a per-user salt for secure storage"""
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PASSWORD_HASH_ITERATIONS).hex()
+    return f"pbkdf2_sha256${PASSWORD_HASH_ITERATIONS}${salt}${digest}"
 
 # Simple in-memory user storage (keeps existing functionality)
 USERS_DB = {
     'admin': {
-        'password_hash': hashlib.sha256('admin123'.encode()).hexdigest(),
+        'password_hash': hash_password('admin123'),
         'role': 'admin',
         'name': 'Administrator',
         'email': 'admin@arthursden.com',
         'created': datetime.now().isoformat(),
-        'search_terms': [
-            "nursery wall art uk",
-            "personalised baby gifts",
-            "custom name sign uk",
-            "wooden name plaque",
-            "baby room decor uk"
-        ],
+        'search_terms': list(DEFAULT_USER_SEARCH_TERMS),
         'watchlist_shops': [],
         'settings': {
             'notifications': True,
@@ -58,6 +170,9 @@ USERS_DB = {
     }
 }
 
+# Guards USERS_DB writes made from concurrent request threads
+USERS_LOCK = threading.RLock()
+
 # Rate limiting decorator
 def rate_limit(max_requests=10, window=60):
     """Simple rate limiting decorator"""
@@ -66,26 +181,148 @@ def rate_limit(max_requests=10, window=60):
         def wrapper(*args, **kwargs):
             # Simple in-memory rate limiting (use Redis in production)
             client_id = request.remote_addr
-            current_time = time.time()
-            
-            if not hasattr(wrapper, 'requests'):
-                wrapper.requests = {}
+            current_time = time.monotonic()
             
-            if client_id not in wrapper.requests:
-                wrapper.requests[client_id] = []
+            # Request threads share the table, so keep every read and update under one lock
+            with wrapper.lock:
+                # Periodically forget clients with no requests left in the window
+                wrapper.calls += 1
+                if wrapper.calls % 1000 == 0:
+                    wrapper.requests = {
+                        cid: times for cid, times in wrapper.requests.items()
+                        if times and current_time - times[-1] < window
+                    }
+                
+                request_times = wrapper.requests.get(client_id)
+                if request_times is None:
+                    request_times = wrapper.requests[client_id] = deque()
+                
+                # Clean old requests (oldest first, so stop at the first one still in the window)
+                while request_times and current_time - request_times[0] >= window:
+                    request_times.popleft()
+                
+                allowed = len(request_times) < max_requests
+                if allowed:
+                    request_times.append(current_time)
             
-            # Clean old requests
-            wrapper.requests[client_id] = [
-                req_time for req_time in wrapper.requests[client_id]
-                if current_time - req_time < window
-            ]
-            
-            if len(wrapper.requests[client_id]) >= max_requests:
+            if not allowed:
                 logger.warning(f"Rate limit exceeded for {client_id}")
                 return jsonify({'error': 'Rate limit exceeded'}), 429
             
-            wrapper.requests[client_id].append(current_time)
             return f(*args, **kwargs)
+        
+        wrapper.requests = {}
+        wrapper.calls = 0
+        wrapper.lock = threading.Lock()
+        return wrapper
+    return decorator
+
+# Authentication decorator for JSON endpoints
+def login_required(f):
+    """Reject unauthenticated API requests with a 401"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if not session.get('authenticated'):
+            return jsonify({'error': 'Authentication required'}), 401
+        return f(*args, **kwargs)
+    return wrapper
+
+# Admin-only decorator for user management and system endpoints
+def admin_required(f):
+    """Reject requests from anyone but a logged-in admin with a 403"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if not session.get('authenticated') or session.get('user_role') != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return wrapper
+
+# TTL cache decorator
+def ttl_cache(ttl=300, maxsize=512, negative_ttl=0, stale=0, transient_errors=()):
+    """Cache results in memory for ttl seconds (None results for negative_ttl), keyed on call arguments"""
+    def decorator(f):
+        cache = {}
+        key_locks = {}
+        lock = threading.Lock()
+        # Whether this thread's most recent call was served from the cache
+        last_call = threading.local()
+
+        def store(key, result):
+            # Keep failures briefly so the next calls retry upstream soon
+            lifetime = ttl if result is not None else negative_ttl
+            if lifetime > 0:
+                expires_at = time.time() + lifetime
+                stale_until = expires_at + stale if result is not None else expires_at
+                with lock:
+                    if key not in cache and len(cache) >= maxsize:
+                        # Drop entries past their stale window first, then the oldest stored one
+                        now = time.time()
+                        for dead in [k for k, entry in cache.items() if entry[1] <= now]:
+                            del cache[dead]
+                        if len(cache) >= maxsize:
+                            cache.pop(next(iter(cache)))
+                    # Re-insert so dict order follows store time
+                    cache.pop(key, None)
+                    cache[key] = (expires_at, stale_until, result)
+
+        def release(key, key_lock):
+            # Locks only live while a key is being computed, so key_locks stays bounded
+            with lock:
+                if key_locks.get(key) is key_lock:
+                    del key_locks[key]
+            key_lock.release()
+
+        def refresh(key, key_lock, args, kwargs):
+            try:
+                store(key, f(*args, **kwargs))
+            except transient_errors:
+                # Keep serving the stale result; a later call will try again
+                pass
+            finally:
+                release(key, key_lock)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # Simple in-process cache (use Redis in production)
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.time()
+
+            with lock:
+                entry = cache.get(key)
+                if entry and entry[0] > now:
+                    last_call.hit = True
+                    return entry[2]
+                key_lock = key_locks.setdefault(key, threading.Lock())
+
+            # For up to stale seconds past expiry, serve the old result while one background thread refreshes it
+            if entry and entry[1] > now:
+                if key_lock.acquire(blocking=False):
+                    threading.Thread(target=refresh, args=(key, key_lock, args, kwargs), daemon=True).start()
+                last_call.hit = True
+                return entry[2]
+
+            # Only one thread recomputes an expired key; the rest wait and reuse it
+            key_lock.acquire()
+            try:
+                with lock:
+                    entry = cache.get(key)
+                if entry and entry[0] > time.time():
+                    last_call.hit = True
+                    return entry[2]
+
+                last_call.hit = False
+                try:
+                    result = f(*args, **kwargs)
+                except transient_errors:
+                    # Nothing usable to serve, so callers see a failure (None) like any other
+                    result = None
+                store(key, result)
+            finally:
+                release(key, key_lock)
+            return result
+
+        wrapper.cache = cache
+        wrapper.last_call = last_call
         return wrapper
     return decorator
 
@@ -94,61 +331,54 @@ def log_api_call(f):
     """Log API calls for monitoring"""
     @wraps(f)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
+        endpoint = request.endpoint
         user_id = session.get('username')
         
+        # The message is built here; the stderr write happens on the background log listener
         try:
             result = f(*args, **kwargs)
-            response_time = time.time() - start_time
-            status_code = 200 if hasattr(result, 'status_code') else 200
+            response_time = time.perf_counter() - start_time
+            status_code = result[1] if isinstance(result, tuple) else getattr(result, 'status_code', 200)
             
-            db.log_api_call(
-                endpoint=request.endpoint,
-                user_id=user_id,
-                status_code=status_code,
-                response_time=response_time
-            )
+            api_logger.info("%s user=%s status=%s time=%.3fs",
+                            endpoint, user_id, status_code, response_time)
             
             return result
         except Exception as e:
-            response_time = time.time() - start_time
-            db.log_api_call(
-                endpoint=request.endpoint,
-                user_id=user_id,
-                status_code=500,
-                response_time=response_time,
-                error_message=str(e)
-            )
-            logger.error(f"API error in {request.endpoint}: {e}")
+            response_time = time.perf_counter() - start_time
+            api_logger.error("%s user=%s status=500 time=%.3fs error=%s",
+                             endpoint, user_id, response_time, e)
             raise
     return wrapper
 
-def hash_password(password):
-    """Hash password for secure storage"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def verify_password(password, hash_password):
     """Verify password against hash"""
-    return hashlib.sha256(password.encode()).hexdigest() == hash_password
+    if '$' in hash_password:
+        _, iterations, salt, expected = hash_password.split('$')
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), int(iterations)).hex()
+    else:
+        # Legacy unsalted SHA-256 hex digest
+        expected = hash_password
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(candidate.encode(), expected.encode())
+
+# Checked against when the username is unknown, to keep login timing uniform
+DUMMY_PASSWORD_HASH = hash_password(secrets.token_hex(16))
+
+def password_needs_rehash(hash_password):
+    """Check whether a stored hash predates the current PBKDF2 settings"""
+    return not hash_password.startswith(f"pbkdf2_sha256${PASSWORD_HASH_ITERATIONS}$")
 
 def create_user(username, password, name, email, role='user'):
     """Create new user account"""
-    if username in USERS_DB:
-        return False, "Username already exists"
-    
-    USERS_DB[username] = {
+    user = {
         'password_hash': hash_password(password),
         'role': role,
         'name': name,
         'email': email,
         'created': datetime.now().isoformat(),
-        'search_terms': [
-            "nursery wall art uk",
-            "personalised baby gifts",
-            "custom name sign uk",
-            "wooden name plaque",
-            "baby room decor uk"
-        ],
+        'search_terms': list(DEFAULT_USER_SEARCH_TERMS),
         'watchlist_shops': [],
         'settings': {
             'notifications': True,
@@ -156,14 +386,91 @@ def create_user(username, password, name, email, role='user'):
             'export_format': 'csv'
         }
     }
+    
+    with USERS_LOCK:
+        if username in USERS_DB:
+            return False, "Username already exists"
+        USERS_DB[username] = user
     return True, "User created successfully"
 
 def get_user_data(username):
     """Get user data from database"""
     return USERS_DB.get(username, {})
 
+def utc_timestamp(fmt):
+    """Format the current UTC time, reusing the string within the same second"""
+    current_second = int(time.time())
+    cached = utc_timestamp.cache.get(fmt)
+    if cached and cached[0] == current_second:
+        return cached[1]
+    
+    formatted = time.strftime(fmt, time.gmtime(current_second))
+    utc_timestamp.cache[fmt] = (current_second, formatted)
+    return formatted
+
+utc_timestamp.cache = {}
+
+# Realistic UK-focused demo data shown until the Etsy API key is approved
+DEMO_PRODUCTS = (
+    {
+        "id": 1, "title": "Personalised Baby Milestone Blanket - Monthly...",
+        "shop": "BabyMilestoneUK", "price": 34.99, "currency": "GBP", "views": 1850, "favorites": 127,
+        "weekly_sales": 23, "revenue": 3218, "sales_trend": "+18%",
+        "market_trend": "Hot", "priority": "Critical", 
+        "etsy_url": "https://etsy.com/uk/listing/example1",
+        "search_term": "milestone baby blanket",
+        "seller_profile": {"shop_name": "BabyMilestoneUK", "seller_location": "United Kingdom", "is_uk_seller": True, "currency_code": "GBP"}
+    },
+    {
+        "id": 2, "title": "Custom Nursery Name Sign - Wooden Laser Cut...",
+        "shop": "WoodCraftStudioUK", "price": 29.50, "currency": "GBP", "views": 2140, "favorites": 89,
+        "weekly_sales": 31, "revenue": 3658, "sales_trend": "+25%",
+        "market_trend": "Trending", "priority": "High",
+        "etsy_url": "https://etsy.com/uk/listing/example2", 
+        "search_term": "custom name sign uk",
+        "seller_profile": {"shop_name": "WoodCraftStudioUK", "seller_location": "England", "is_uk_seller": True, "currency_code": "GBP"}
+    },
+    {
+        "id": 3, "title": "Baby Shower Decorations Set - Gender Neutral...",
+        "shop": "PartyPerfectUK", "price": 22.99, "currency": "GBP", "views": 1230, "favorites": 67,
+        "weekly_sales": 19, "revenue": 1747, "sales_trend": "+12%",
+        "market_trend": "Stable", "priority": "Medium",
+        "etsy_url": "https://etsy.com/uk/listing/example3",
+        "search_term": "baby shower decorations uk",
+        "seller_profile": {"shop_name": "PartyPerfectUK", "seller_location": "Scotland", "is_uk_seller": True, "currency_code": "GBP"}
+    },
+    {
+        "id": 4, "title": "Nursery Wall Art Print Set - Safari Animals...",
+        "shop": "ModernNurseryArtUK", "price": 12.99, "currency": "GBP", "views": 3450, "favorites": 234,
+        "weekly_sales": 45, "revenue": 2338, "sales_trend": "+35%",
+        "market_trend": "Hot", "priority": "Critical",
+        "etsy_url": "https://etsy.com/uk/listing/example4",
+        "search_term": "nursery wall art uk",
+        "seller_profile": {"shop_name": "ModernNurseryArtUK", "seller_location": "Wales", "is_uk_seller": True, "currency_code": "GBP"}
+    },
+    {
+        "id": 5, "title": "Bespoke Baby Gift Set - Personalised Bundle...",
+        "shop": "BespokeBabyGiftsUK", "price": 52.50, "currency": "GBP", "views": 890, "favorites": 45,
+        "weekly_sales": 12, "revenue": 2520, "sales_trend": "+8%",
+        "market_trend": "Emerging", "priority": "Medium",
+        "etsy_url": "https://etsy.com/uk/listing/example5",
+        "search_term": "bespoke baby gifts",
+        "seller_profile": {"shop_name": "BespokeBabyGiftsUK", "seller_location": "United Kingdom", "is_uk_seller": True, "currency_code": "GBP"}
+    }
+)
+
+class EtsyUnavailable(Exception):
+    """Etsy could not be reached or failed server-side (timeout, connection error, 5xx)"""
+
+# Transient failures keep serving stale listings; auth/rate-limit failures replace them
+@ttl_cache(ttl=300, negative_ttl=10, stale=600, transient_errors=(EtsyUnavailable,))
 def fetch_etsy_listings(keywords, limit=20):
     """Fetch real-time listings from Etsy API with comprehensive seller data"""
+    # Skip API call if no valid API key (for demo mode)
+    if ETSY_DEMO_MODE:
+        logger.debug("Using demo mode for keywords: %s", keywords)
+        return None  # This will trigger demo data
+    
     # Validate and sanitize input
     if not keywords or not isinstance(keywords, str):
         logger.warning("Invalid keywords provided to fetch_etsy_listings")
@@ -174,59 +481,46 @@ def fetch_etsy_listings(keywords, limit=20):
     safe_limit = min(max(safe_limit, 1), 100)  # Clamp between 1-100
     
     try:
-        # Skip API call if no valid API key (for demo mode)
-        if not ETSY_API_KEY or ETSY_API_KEY == 'your-etsy-api-key':
-            logger.info(f"Using demo mode for keywords: {clean_keywords}")
-            return None  # This will trigger demo data
-        
-        headers = {
-            'x-api-key': ETSY_API_KEY,
-            'Authorization': f'Bearer {ETSY_API_KEY}'
-        }
-        
-        params = {
-            'keywords': clean_keywords,
-            'limit': safe_limit,
-            'includes': 'Images,Shop,User,Translations',
-            'sort_on': 'created',
-            'sort_order': 'desc'
-        }
+        params = {**ETSY_LISTING_PARAMS, 'keywords': clean_keywords, 'limit': safe_limit}
         
-        logger.info(f"Fetching Etsy data for: {clean_keywords}")
+        logger.debug("Fetching Etsy data for: %s", clean_keywords)
         
-        response = requests.get(
-            f'{ETSY_BASE_URL}/application/listings/active',
-            headers=headers,
+        response = etsy_session.get(
+            ETSY_LISTINGS_URL,
             params=params,
-            timeout=15
+            timeout=ETSY_TIMEOUT
         )
         
-        logger.info(f"Etsy API response status: {response.status_code}")
+        response.raise_for_status()
         
-        if response.status_code == 200:
-            data = response.json()
-            result_count = len(data.get('results', []))
-            logger.info(f"Successfully fetched {result_count} listings")
-            return data
-        elif response.status_code == 429:
+        data = orjson.loads(response.content) if orjson else response.json()
+        logger.debug("Successfully fetched %d listings", len(data.get('results', [])))
+        return data
+            
+    except requests.exceptions.HTTPError as e:
+        status_code = e.response.status_code
+        if status_code == 429:
             logger.warning("Etsy API rate limit exceeded, using demo data")
-            return None
-        elif response.status_code == 401:
+        elif status_code == 401:
             logger.error("Etsy API authentication failed, check API key")
-            return None
+        elif status_code >= 500:
+            logger.error("Etsy API Error: %s", status_code)
+            raise EtsyUnavailable(status_code) from e
         else:
-            logger.error(f"Etsy API Error: {response.status_code}")
-            return None
-            
-    except requests.exceptions.Timeout:
-        logger.warning("Etsy API timeout, using demo data")
-        return None
-    except requests.exceptions.ConnectionError:
-        logger.warning("Etsy API connection error, using demo data")
+            logger.error("Etsy API Error: %s", status_code)
         return None
+    except requests.exceptions.Timeout as e:
+        logger.warning("Etsy API timeout")
+        raise EtsyUnavailable('timeout') from e
+    except requests.exceptions.ConnectionError as e:
+        logger.warning("Etsy API connection error")
+        raise EtsyUnavailable('connection error') from e
     except Exception as e:
-        logger.error(f"Unexpected error fetching Etsy data: {e}")
-        return None
+        logger.error("Unexpected error fetching Etsy data: %s", e)
+        raise EtsyUnavailable('unexpected error') from e
+
+# Shop country names that count as a UK seller
+UK_COUNTRY_NAMES = frozenset({'united kingdom', 'uk', 'great britain', 'england', 'scotland', 'wales'})
 
 def process_etsy_data(listings_data, search_term):
     """Process Etsy API response with comprehensive seller intelligence"""
@@ -238,23 +532,29 @@ def process_etsy_data(listings_data, search_term):
     for i, listing in enumerate(listings_data['results'][:10]):  # Top 10 results
         try:
             # Basic product data
-            price = float(listing.get('price', {}).get('amount', 0)) / 100
+            # `or {}` only builds a fallback when the field is missing, unlike a .get default
+            price = float((listing.get('price') or {}).get('amount', 0)) / 100
             views = listing.get('views', 0)
             favorites = listing.get('num_favorers', 0)
             
             # Enhanced shop/seller data
-            shop_data = listing.get('Shop', {})
-            user_data = listing.get('User', {})
-            images = listing.get('Images', [])
+            shop_data = listing.get('Shop') or {}
+            user_data = listing.get('User') or {}
+            images = listing.get('Images') or ()
+            shop_name = shop_data.get('shop_name')
+            country_name = shop_data.get('country_name') or ''
+            total_sales = shop_data.get('total_sales', 0)
+            currency_code = shop_data.get('currency_code', 'GBP')  # Default to GBP for UK
+            description = listing.get('description')
             
             # Extract comprehensive seller profile with UK preference
             seller_profile = {
-                'shop_name': shop_data.get('shop_name', 'Unknown Shop'),
+                'shop_name': shop_name or 'Unknown Shop',
                 'shop_id': shop_data.get('shop_id', ''),
-                'shop_url': f"https://etsy.com/uk/shop/{shop_data.get('shop_name', '')}" if shop_data.get('shop_name') else '',
-                'seller_location': shop_data.get('country_name', 'Unknown'),
+                'shop_url': f"https://etsy.com/uk/shop/{shop_name}" if shop_name else '',
+                'seller_location': country_name or 'Unknown',
                 'shop_created': shop_data.get('create_date', ''),
-                'total_sales': shop_data.get('total_sales', 0),
+                'total_sales': total_sales,
                 'digital_sales': shop_data.get('digital_sales', 0),
                 'shop_policy': shop_data.get('policy_welcome', ''),
                 'seller_avatar': user_data.get('avatar_url_fullxfull', ''),
@@ -263,8 +563,8 @@ def process_etsy_data(listings_data, search_term):
                 'vacation_message': shop_data.get('vacation_message', ''),
                 'announcement': shop_data.get('announcement', ''),
                 'shop_languages': shop_data.get('languages', []),
-                'currency_code': shop_data.get('currency_code', 'GBP'),  # Default to GBP for UK
-                'is_uk_seller': shop_data.get('country_name', '').lower() in ['united kingdom', 'uk', 'great britain', 'england', 'scotland', 'wales']
+                'currency_code': currency_code,
+                'is_uk_seller': country_name.lower() in UK_COUNTRY_NAMES
             }
             
             # Product images for visual analysis
@@ -282,7 +582,7 @@ def process_etsy_data(listings_data, search_term):
             estimated_revenue = estimated_weekly_sales * price * 4
             
             # Enhanced priority scoring
-            shop_score = min(100, (seller_profile['total_sales'] or 0) / 100)
+            shop_score = min(100, (total_sales or 0) / 100)
             engagement_score = min(100, (views + favorites * 2) / 50)
             priority_score = (shop_score + engagement_score) / 2
             
@@ -300,9 +600,10 @@ def process_etsy_data(listings_data, search_term):
                 "id": i + 1,
                 "listing_id": listing.get('listing_id', ''),
                 "title": listing.get('title', 'Unknown Product'),
-                "description": listing.get('description', '')[:200] + "..." if listing.get('description') else '',
+                "shop": seller_profile['shop_name'],
+                "description": description[:200] + "..." if description else '',
                 "price": price,
-                "currency": seller_profile['currency_code'],
+                "currency": currency_code,
                 "views": views,
                 "favorites": favorites,
                 "weekly_sales": estimated_weekly_sales,
@@ -328,128 +629,96 @@ def process_etsy_data(listings_data, search_term):
             
             processed_products.append(product)
             
-        except Exception as e:
-            print(f"Error processing listing: {e}")
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            # Skip malformed listings; these come from upstream data, not our code
+            logger.debug("Error processing listing: %s", e)
             continue
     
     return processed_products
 
 @app.route('/')
 def home():
-    if not session.get('authenticated'):
+    # Resolve the session proxy once for this view
+    user_session = session._get_current_object()
+    if not user_session.get('authenticated'):
         return redirect('/login')
     return render_template('dashboard.html', 
-                         username=session.get('user_name', session.get('username', 'Admin')),
-                         user_role=session.get('user_role', 'user'))
+                         username=user_session.get('user_name', user_session.get('username', 'Admin')),
+                         user_role=user_session.get('user_role', 'user'))
 
-@app.route('/api/market-data')
-@rate_limit(max_requests=20, window=60)
-@log_api_call
-def get_market_data():
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
+# UK-focused search terms used when the session has none of its own
+DEFAULT_MARKET_SEARCH_TERMS = (
+    "nursery wall art uk",
+    "personalised baby gifts uk", 
+    "milestone baby blanket",
+    "custom name sign uk",
+    "baby shower decorations uk",
+    "wooden name plaque",
+    "children's bedroom decor",
+    "bespoke baby gifts"
+)
+
+def get_session_search_settings():
+    """Get the current user's search terms and watchlist shops from the session"""
+    user_session = session._get_current_object()
     
     # Get custom search terms from session or use UK-focused defaults
-    search_terms = session.get('search_terms', [
-        "nursery wall art uk",
-        "personalised baby gifts uk", 
-        "milestone baby blanket",
-        "custom name sign uk",
-        "baby shower decorations uk",
-        "wooden name plaque",
-        "children's bedroom decor",
-        "bespoke baby gifts"
-    ])
+    search_terms = user_session.get('search_terms', DEFAULT_MARKET_SEARCH_TERMS)
     
     # Get shops to watch from session
-    watchlist_shops = session.get('watchlist_shops', [])
+    watchlist_shops = user_session.get('watchlist_shops', [])
+    
+    # Tuples so the settings can key the market data cache
+    return tuple(search_terms), tuple(watchlist_shops)
+
+@ttl_cache(ttl=120, maxsize=64)
+def build_market_data(search_terms, watchlist_shops):
+    """Build the market data payload (products and insights) for the given search settings"""
+    # Match every watchlist shop in one scan of each shop name rather than one substring test per shop
+    watchlist_pattern = re.compile('|'.join(re.escape(shop.lower()) for shop in watchlist_shops)) if watchlist_shops else None
     
     all_products = []
-    total_revenue = 0
-    total_weekly_sales = 0
-    critical_alerts = 0
     
-    for term in search_terms:
-        listings_data = fetch_etsy_listings(term, limit=5)  # Get 5 per category
+    # Fetch all search terms concurrently; each call is network-bound
+    if ETSY_DEMO_MODE:
+        fetched = [None] * len(search_terms)
+    else:
+        fetched = list(etsy_executor.map(lambda term: fetch_etsy_listings(term, limit=5), search_terms))  # Get 5 per category
+    
+    for term, listings_data in zip(search_terms, fetched):
         if listings_data:
             products = process_etsy_data(listings_data, term)
             
             # Filter by watchlist shops if specified
-            if watchlist_shops:
+            if watchlist_pattern:
                 filtered_products = []
                 for product in products:
-                    if any(shop.lower() in product['shop'].lower() for shop in watchlist_shops):
+                    if watchlist_pattern.search(product['shop'].lower()):
                         product['watchlist_match'] = True
                         filtered_products.append(product)
                 products = filtered_products
             
             all_products.extend(products)
-            
-            # Calculate totals
-            for product in products:
-                total_revenue += product['revenue']
-                total_weekly_sales += product['weekly_sales']
-                if product['priority'] == 'Critical':
-                    critical_alerts += 1
     
     # If API fails, use realistic UK-focused demo data showing what you'll get when approved
     if not all_products:
-        all_products = [
-            {
-                "id": 1, "title": "Personalised Baby Milestone Blanket - Monthly...",
-                "shop": "BabyMilestoneUK", "price": 34.99, "currency": "GBP", "views": 1850, "favorites": 127,
-                "weekly_sales": 23, "revenue": 3218, "sales_trend": "+18%",
-                "market_trend": "Hot", "priority": "Critical", 
-                "etsy_url": "https://etsy.com/uk/listing/example1",
-                "search_term": "milestone baby blanket",
-                "seller_profile": {"shop_name": "BabyMilestoneUK", "seller_location": "United Kingdom", "is_uk_seller": True, "currency_code": "GBP"}
-            },
-            {
-                "id": 2, "title": "Custom Nursery Name Sign - Wooden Laser Cut...",
-                "shop": "WoodCraftStudioUK", "price": 29.50, "currency": "GBP", "views": 2140, "favorites": 89,
-                "weekly_sales": 31, "revenue": 3658, "sales_trend": "+25%",
-                "market_trend": "Trending", "priority": "High",
-                "etsy_url": "https://etsy.com/uk/listing/example2", 
-                "search_term": "custom name sign uk",
-                "seller_profile": {"shop_name": "WoodCraftStudioUK", "seller_location": "England", "is_uk_seller": True, "currency_code": "GBP"}
-            },
-            {
-                "id": 3, "title": "Baby Shower Decorations Set - Gender Neutral...",
-                "shop": "PartyPerfectUK", "price": 22.99, "currency": "GBP", "views": 1230, "favorites": 67,
-                "weekly_sales": 19, "revenue": 1747, "sales_trend": "+12%",
-                "market_trend": "Stable", "priority": "Medium",
-                "etsy_url": "https://etsy.com/uk/listing/example3",
-                "search_term": "baby shower decorations uk",
-                "seller_profile": {"shop_name": "PartyPerfectUK", "seller_location": "Scotland", "is_uk_seller": True, "currency_code": "GBP"}
-            },
-            {
-                "id": 4, "title": "Nursery Wall Art Print Set - Safari Animals...",
-                "shop": "ModernNurseryArtUK", "price": 12.99, "currency": "GBP", "views": 3450, "favorites": 234,
-                "weekly_sales": 45, "revenue": 2338, "sales_trend": "+35%",
-                "market_trend": "Hot", "priority": "Critical",
-                "etsy_url": "https://etsy.com/uk/listing/example4",
-                "search_term": "nursery wall art uk",
-                "seller_profile": {"shop_name": "ModernNurseryArtUK", "seller_location": "Wales", "is_uk_seller": True, "currency_code": "GBP"}
-            },
-            {
-                "id": 5, "title": "Bespoke Baby Gift Set - Personalised Bundle...",
-                "shop": "BespokeBabyGiftsUK", "price": 52.50, "currency": "GBP", "views": 890, "favorites": 45,
-                "weekly_sales": 12, "revenue": 2520, "sales_trend": "+8%",
-                "market_trend": "Emerging", "priority": "Medium",
-                "etsy_url": "https://etsy.com/uk/listing/example5",
-                "search_term": "bespoke baby gifts",
-                "seller_profile": {"shop_name": "BespokeBabyGiftsUK", "seller_location": "United Kingdom", "is_uk_seller": True, "currency_code": "GBP"}
-            }
-        ]
-        total_revenue = sum(p['revenue'] for p in all_products)
-        total_weekly_sales = sum(p['weekly_sales'] for p in all_products)
-        critical_alerts = len([p for p in all_products if p['priority'] == 'Critical'])
+        all_products = list(DEMO_PRODUCTS)
+    
+    # Calculate totals in a single pass over whichever products we ended up with
+    total_revenue = 0
+    total_weekly_sales = 0
+    critical_alerts = 0
+    for product in all_products:
+        total_revenue += product['revenue']
+        total_weekly_sales += product['weekly_sales']
+        if product['priority'] == 'Critical':
+            critical_alerts += 1
     
     # Calculate averages
     avg_weekly_sales = round(total_weekly_sales / len(all_products), 1) if all_products else 0
     
     # Generate insights from real data
-    top_products = sorted(all_products, key=lambda x: x['revenue'], reverse=True)[:3]
+    top_products = heapq.nlargest(3, all_products, key=itemgetter('revenue'))
     
     opportunities = []
     alerts = []
@@ -481,47 +750,91 @@ def get_market_data():
                 "top_opportunity": top_products[0]['search_term'].title() if top_products else "No data",
                 "critical_alerts": critical_alerts,
                 "market_health": "Excellent" if critical_alerts > 0 else "Good",
-                "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+                "last_updated": utc_timestamp("%Y-%m-%d %H:%M:%S UTC")
             },
             "opportunities": opportunities,
             "alerts": alerts
         }
     }
     
-    return jsonify(market_data)
+    return market_data
 
-@app.route('/api/export')
-def export_data():
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    # Get current market data for export
-    market_response = get_market_data()
-    market_data = market_response.get_json()
+@app.route('/api/market-data')
+@rate_limit(max_requests=20, window=60)
+@log_api_call
+@login_required
+def get_market_data():
+    response = jsonify(build_market_data(*get_session_search_settings()))
+    response.headers['X-Cache'] = 'HIT' if build_market_data.last_call.hit else 'MISS'
     
-    import io
-    from flask import Response
+    # Let the browser reuse or revalidate the payload between dashboard polls
+    response.headers['Cache-Control'] = 'private, max-age=60, stale-while-revalidate=120'
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+CSV_EXPORT_HEADER = "Product,Shop,Price,Views,Favorites,Weekly Sales,Revenue,Priority,Trend,Search Term,Etsy URL\n"
+CSV_BATCH_ROWS = 100
+
+def csv_export_row(product):
+    """Build one export CSV row for a product"""
+    currency_symbol = '£' if product.get('currency', 'GBP') == 'GBP' else '$'
+    return (
+        product["title"],
+        product["shop"],
+        f'{currency_symbol}{product["price"]:.2f}',
+        product["views"],
+        product["favorites"],
+        product["weekly_sales"],
+        f'{currency_symbol}{product["revenue"]}',
+        product["priority"],
+        product["market_trend"],
+        product["search_term"],
+        product.get("etsy_url", "")
+    )
+
+def iter_csv_rows(products):
+    """Yield the export CSV in batches of rows so it can be streamed"""
+    buffer = io.StringIO()
+    buffer.write(CSV_EXPORT_HEADER)
+    writer = csv.writer(buffer, lineterminator='\n')
     
-    output = io.StringIO()
-    output.write("Product,Shop,Price,Views,Favorites,Weekly Sales,Revenue,Priority,Trend,Search Term,Etsy URL\n")
+    # Write rows in batches so each streamed chunk isn't a single tiny line
+    for start in range(0, len(products), CSV_BATCH_ROWS):
+        writer.writerows(csv_export_row(product) for product in products[start:start + CSV_BATCH_ROWS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
     
-    for product in market_data['products']:
-        currency_symbol = '£' if product.get('currency', 'GBP') == 'GBP' else '$'
-        output.write(f'"{product["title"]}","{product["shop"]}",{currency_symbol}{product["price"]:.2f},{product["views"]},{product["favorites"]},{product["weekly_sales"]},{currency_symbol}{product["revenue"]},{product["priority"]},{product["market_trend"]},"{product["search_term"]}","{product.get("etsy_url", "")}"\n')
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# Demo-mode exports are always the same rows, so render them once
+DEMO_EXPORT_CSV = ''.join(iter_csv_rows(DEMO_PRODUCTS))
+
+@app.route('/api/export')
+@login_required
+def export_data():
+    if ETSY_DEMO_MODE:
+        body = DEMO_EXPORT_CSV
+    else:
+        # Get current market data for export
+        market_data = build_market_data(*get_session_search_settings())
+        body = iter_csv_rows(market_data['products'])
     
-    output.seek(0)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = utc_timestamp("%Y%m%d_%H%M%S")
     return Response(
-        output.getvalue(),
+        body,
         mimetype='text/csv',
         headers={'Content-Disposition': f'attachment; filename=arthursden_realtime_data_{timestamp}.csv'}
     )
 
-@app.route('/login', methods=['GET', 'POST'])
+@app.route('/login', methods=['GET'])
+def login_page():
+    return render_template('login.html')
+
+@app.route('/login', methods=['POST'])
+@rate_limit(max_requests=10, window=60)
 def login():
-    if request.method == 'GET':
-        return render_template('login.html')
-    
     # Handle login submission
     if request.is_json:
         data = request.get_json()
@@ -535,6 +848,11 @@ def login():
     if username in USERS_DB:
         user_data = USERS_DB[username]
         if verify_password(password, user_data['password_hash']):
+            # Upgrade legacy hashes now that we know the plain password
+            if password_needs_rehash(user_data['password_hash']):
+                new_hash = hash_password(password)
+                with USERS_LOCK:
+                    user_data['password_hash'] = new_hash
             session['authenticated'] = True
             session['username'] = username
             session['user_role'] = user_data['role']
@@ -545,45 +863,53 @@ def login():
             logger.info(f"User {username} logged in successfully")
             return jsonify({'success': True, 'message': 'Login successful', 'redirect': '/'})
     
-    # Fallback to legacy admin credentials
-    elif username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
-        session['authenticated'] = True
-        session['username'] = username
-        session['user_role'] = 'admin'
-        session['user_name'] = 'Administrator'
-        return jsonify({'success': True, 'message': 'Login successful', 'redirect': '/'})
+    else:
+        # Unknown usernames pay the same PBKDF2 cost, so response time doesn't reveal which accounts exist
+        verify_password(password, DUMMY_PASSWORD_HASH)
+        
+        # Fallback to legacy admin credentials (constant-time, checks both fields)
+        if (hmac.compare_digest(username.encode(), ADMIN_USERNAME.encode())
+              & hmac.compare_digest(password.encode(), ADMIN_PASSWORD.encode())):
+            session['authenticated'] = True
+            session['username'] = username
+            session['user_role'] = 'admin'
+            session['user_name'] = 'Administrator'
+            return jsonify({'success': True, 'message': 'Login successful', 'redirect': '/'})
     
     return jsonify({'error': 'Invalid credentials'}), 401
 
 @app.route('/settings')
 def settings():
-    if not session.get('authenticated'):
+    # Resolve the session proxy once for this view
+    user_session = session._get_current_object()
+    if not user_session.get('authenticated'):
         return redirect('/login')
     
-    username = session.get('username')
+    username = user_session.get('username')
     user_data = get_user_data(username)
     
     return render_template('settings.html', 
-                         username=session.get('user_name', username),
-                         user_role=session.get('user_role', 'user'),
-                         search_terms=session.get('search_terms', []),
-                         watchlist_shops=session.get('watchlist_shops', []),
+                         username=user_session.get('user_name', username),
+                         user_role=user_session.get('user_role', 'user'),
+                         search_terms=user_session.get('search_terms', []),
+                         watchlist_shops=user_session.get('watchlist_shops', []),
                          user_settings=user_data.get('settings', {}))
 
 @app.route('/users')
+@admin_required
 def user_management():
-    if not session.get('authenticated') or session.get('user_role') != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+    # Never hand password hashes to the template
+    with USERS_LOCK:
+        users = {name: {k: v for k, v in user_data.items() if k != 'password_hash'}
+                 for name, user_data in USERS_DB.items()}
     
     return render_template('users.html', 
                          username=session.get('user_name', 'Admin'),
-                         users=USERS_DB)
+                         users=users)
 
 @app.route('/api/create-user', methods=['POST'])
+@admin_required
 def api_create_user():
-    if not session.get('authenticated') or session.get('user_role') != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     try:
         data = request.get_json()
         if not data:
@@ -631,28 +957,26 @@ def api_create_user():
         return jsonify({'error': 'Failed to create user. Please try again.'}), 500
 
 @app.route('/api/delete-user', methods=['POST'])
+@admin_required
 def api_delete_user():
-    if not session.get('authenticated') or session.get('user_role') != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     data = request.get_json()
     username = data.get('username', '').strip()
     
     if username == 'admin':
         return jsonify({'error': 'Cannot delete admin user'}), 400
     
-    if username in USERS_DB:
-        del USERS_DB[username]
+    with USERS_LOCK:
+        deleted = USERS_DB.pop(username, None) is not None
+    
+    if deleted:
         logger.info(f"User {username} deleted by admin {session.get('username')}")
         return jsonify({'success': True, 'message': 'User deleted successfully'})
     else:
         return jsonify({'error': 'User not found'}), 404
 
 @app.route('/api/update-search-terms', methods=['POST'])
+@login_required
 def update_search_terms():
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
-    
     try:
         data = request.get_json()
         if not data:
@@ -669,8 +993,9 @@ def update_search_terms():
         session['search_terms'] = clean_terms
         
         # Save to user profile
-        if username in USERS_DB:
-            USERS_DB[username]['search_terms'] = clean_terms
+        with USERS_LOCK:
+            if username in USERS_DB:
+                USERS_DB[username]['search_terms'] = clean_terms
         
         logger.info(f"Updated {len(clean_terms)} search terms for user {username}")
         
@@ -685,10 +1010,8 @@ def update_search_terms():
         return jsonify({'error': 'Failed to update search terms. Please try again.'}), 500
 
 @app.route('/api/update-watchlist', methods=['POST'])
+@login_required
 def update_watchlist():
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
-    
     try:
         data = request.get_json()
         if not data:
@@ -705,8 +1028,9 @@ def update_watchlist():
         session['watchlist_shops'] = clean_shops
         
         # Save to user profile
-        if username in USERS_DB:
-            USERS_DB[username]['watchlist_shops'] = clean_shops
+        with USERS_LOCK:
+            if username in USERS_DB:
+                USERS_DB[username]['watchlist_shops'] = clean_shops
         
         logger.info(f"Updated watchlist with {len(clean_shops)} shops for user {username}")
         
@@ -720,59 +1044,64 @@ def update_watchlist():
         logger.error(f"Error updating watchlist: {e}")
         return jsonify({'error': 'Failed to update watchlist. Please try again.'}), 500
 
+# UK-focused demo detail record, shared by every product-details request
+DEMO_PRODUCT_DETAILS = {
+    'title': 'Custom Wooden Name Sign - Personalised Nursery Decor',
+    'description': 'Beautiful handcrafted wooden name sign perfect for nursery decoration. Made from premium birch wood with smooth finish. Customisable colours and fonts available. Made in the UK with free UK delivery.',
+    'price': 29.99,
+    'currency': 'GBP',
+    'views': 2450,
+    'favorites': 127,
+    'tags': ['nursery', 'wooden sign', 'personalised', 'baby decor', 'custom', 'uk made'],
+    'materials': ['birch wood', 'acrylic paint', 'protective finish'],
+    'seller_profile': {
+        'shop_name': 'CustomWoodCraftsUK',
+        'shop_url': 'https://etsy.com/uk/shop/CustomWoodCraftsUK',
+        'seller_location': 'United Kingdom',
+        'total_sales': 1247,
+        'shop_created': '2020-03-15',
+        'seller_avatar': 'https://i.etsystatic.com/avatar.jpg',
+        'seller_bio': 'Passionate UK woodworker creating beautiful custom pieces for your home. All items handmade in our workshop in England.',
+        'announcement': 'New autumn collection now available! Custom orders welcome. Free UK delivery on orders over £25.',
+        'is_vacation': False,
+        'is_uk_seller': True,
+        'currency_code': 'GBP'
+    },
+    'product_images': [
+        {
+            'thumbnail': 'https://i.etsystatic.com/123/thumb.jpg',
+            'small': 'https://i.etsystatic.com/123/small.jpg',
+            'medium': 'https://i.etsystatic.com/123/medium.jpg',
+            'large': 'https://i.etsystatic.com/123/large.jpg'
+        }
+    ],
+    'processing_time': 3,
+    'shipping_info': 'Ships within 3-5 business days. Free UK delivery.',
+    'quantity': 15,
+    'created_date': '2024-01-15T10:30:00Z',
+    'priority_score': 85.2
+}
+
 @app.route('/api/product-details/<listing_id>')
+@login_required
 def get_product_details(listing_id):
     """Get detailed product information including seller profile and images"""
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
-    
     # In a real implementation, this would fetch from your stored data
     # For now, return UK-focused demo detailed data
-    detailed_product = {
-        'listing_id': listing_id,
-        'title': 'Custom Wooden Name Sign - Personalised Nursery Decor',
-        'description': 'Beautiful handcrafted wooden name sign perfect for nursery decoration. Made from premium birch wood with smooth finish. Customisable colours and fonts available. Made in the UK with free UK delivery.',
-        'price': 29.99,
-        'currency': 'GBP',
-        'views': 2450,
-        'favorites': 127,
-        'tags': ['nursery', 'wooden sign', 'personalised', 'baby decor', 'custom', 'uk made'],
-        'materials': ['birch wood', 'acrylic paint', 'protective finish'],
-        'seller_profile': {
-            'shop_name': 'CustomWoodCraftsUK',
-            'shop_url': 'https://etsy.com/uk/shop/CustomWoodCraftsUK',
-            'seller_location': 'United Kingdom',
-            'total_sales': 1247,
-            'shop_created': '2020-03-15',
-            'seller_avatar': 'https://i.etsystatic.com/avatar.jpg',
-            'seller_bio': 'Passionate UK woodworker creating beautiful custom pieces for your home. All items handmade in our workshop in England.',
-            'announcement': 'New autumn collection now available! Custom orders welcome. Free UK delivery on orders over £25.',
-            'is_vacation': False,
-            'is_uk_seller': True,
-            'currency_code': 'GBP'
-        },
-        'product_images': [
-            {
-                'thumbnail': 'https://i.etsystatic.com/123/thumb.jpg',
-                'small': 'https://i.etsystatic.com/123/small.jpg',
-                'medium': 'https://i.etsystatic.com/123/medium.jpg',
-                'large': 'https://i.etsystatic.com/123/large.jpg'
-            }
-        ],
-        'processing_time': 3,
-        'shipping_info': 'Ships within 3-5 business days. Free UK delivery.',
-        'quantity': 15,
-        'created_date': '2024-01-15T10:30:00Z',
-        'priority_score': 85.2
-    }
-    
-    return jsonify(detailed_product)
+    return jsonify({'listing_id': listing_id, **DEMO_PRODUCT_DETAILS})
 
 @app.route('/logout')
 def logout():
     session.clear()
     return redirect('/login')
 
+# Healthy probe response never changes, so serialize it once
+HEALTHY_RESPONSE_BODY = json.dumps({
+    'status': 'healthy',
+    'app': 'ArthursDen',
+    'database': 'healthy'
+}, separators=(',', ':'))
+
 @app.route('/health')
 def health():
     try:
@@ -783,11 +1112,14 @@ def health():
         logger.error(f"Database health check failed: {e}")
         db_status = 'unhealthy'
     
+    # Load balancer probes hit this often; don't touch the session here
+    if db_status == 'healthy':
+        return Response(HEALTHY_RESPONSE_BODY, mimetype='application/json')
+    
     return {
-        'status': 'healthy' if db_status == 'healthy' else 'degraded',
+        'status': 'degraded',
         'app': 'ArthursDen',
-        'database': db_status,
-        'authenticated': session.get('authenticated', False)
+        'database': db_status
     }
 
 # Error handlers
@@ -809,44 +1141,101 @@ def rate_limit_error(error):
 # Simple request counter (for future use)
 @app.before_request
 def before_request():
-    if hasattr(before_request, 'request_counter'):
-        before_request.request_counter += 1
+    before_request.request_counter += 1
+
+before_request.request_counter = 0
+
+# Gzip compression for the larger JSON/CSV responses
+COMPRESS_MIMETYPES = {'application/json', 'text/csv'}
+COMPRESS_MIN_SIZE = 500
+COMPRESS_LEVEL = 6
+
+def iter_gzip(chunks):
+    """Gzip a streamed response body chunk by chunk"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@app.after_request
+def compress_response(response):
+    if (response.mimetype not in COMPRESS_MIMETYPES
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    
+    if response.is_streamed:
+        response.response = iter_gzip(response.response)
+        response.headers.pop('Content-Length', None)
     else:
-        before_request.request_counter = 1
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+    
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@ttl_cache(ttl=30)
+def probe_etsy_api():
+    """Time one uncached listings call so the debug endpoint reports live connectivity"""
+    start_time = time.perf_counter()
+    try:
+        test_data = fetch_etsy_listings.__wrapped__("baby", 1)
+    except EtsyUnavailable:
+        test_data = None
+    return test_data, time.perf_counter() - start_time
 
 @app.route('/api/debug-etsy')
+@login_required
 def debug_etsy():
-    if not session.get('authenticated'):
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    # Test API connection (safe - won't break demo)
-    start_time = time.time()
-    test_data = fetch_etsy_listings("baby", 1)
-    response_time = time.time() - start_time
+    # Test API connection (safe - won't break demo); polling reuses the last probe for 30s
+    test_data, response_time = probe_etsy_api()
     
     return jsonify({
-        'api_key_configured': ETSY_API_KEY != 'your-etsy-api-key',
-        'api_key_preview': ETSY_API_KEY[:10] + "..." if ETSY_API_KEY != 'your-etsy-api-key' else 'Not set',
+        'api_key_configured': not ETSY_DEMO_MODE,
+        'api_key_preview': ETSY_API_KEY[:10] + "..." if not ETSY_DEMO_MODE else 'Not set',
         'test_call_successful': test_data is not None,
         'response_time_ms': round(response_time * 1000, 2),
-        'demo_mode': ETSY_API_KEY == 'your-etsy-api-key',
+        'demo_mode': ETSY_DEMO_MODE,
         'test_data_sample': test_data.get('results', [])[:1] if test_data else None,
         'base_url': ETSY_BASE_URL,
-        'status': 'Demo mode - using sample data' if ETSY_API_KEY == 'your-etsy-api-key' else 'API ready'
+        'status': 'Demo mode - using sample data' if ETSY_DEMO_MODE else 'API ready'
     })
 
 @app.route('/api/system-stats')
+@admin_required
 def system_stats():
     """Get system performance stats (admin only)"""
-    if not session.get('authenticated') or session.get('user_role') != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     try:
-        import psutil
-        import os
+        if psutil is None:
+            # Fallback if psutil not available
+            total_users = len(USERS_DB)
+            return jsonify({
+                'system': {
+                    'status': 'System monitoring unavailable (install psutil for detailed stats)'
+                },
+                'database': {
+                    'total_users': total_users,
+                    'storage_type': 'in-memory'
+                },
+                'application': {
+                    'demo_mode': ETSY_DEMO_MODE,
+                    'debug_mode': app.debug,
+                    'environment': os.environ.get('FLASK_ENV', 'development')
+                }
+            })
         
-        # Get system stats
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # Get system stats (CPU usage since the previous call, without sleeping)
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -865,24 +1254,7 @@ def system_stats():
                 'storage_type': 'in-memory'
             },
             'application': {
-                'demo_mode': ETSY_API_KEY == 'your-etsy-api-key',
-                'debug_mode': app.debug,
-                'environment': os.environ.get('FLASK_ENV', 'development')
-            }
-        })
-    except ImportError:
-        # Fallback if psutil not available
-        total_users = len(USERS_DB)
-        return jsonify({
-            'system': {
-                'status': 'System monitoring unavailable (install psutil for detailed stats)'
-            },
-            'database': {
-                'total_users': total_users,
-                'storage_type': 'in-memory'
-            },
-            'application': {
-                'demo_mode': ETSY_API_KEY == 'your-etsy-api-key',
+                'demo_mode': ETSY_DEMO_MODE,
                 'debug_mode': app.debug,
                 'environment': os.environ.get('FLASK_ENV', 'development')
             }
@@ -1,7 +1,18 @@
 import re
 import html
+from functools import lru_cache
+from urllib.parse import urlsplit
 from typing import List, Optional
 
+# Validation patterns, compiled once at import
+USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+SHOP_NAME_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9\s\-_]')
+
+# Etsy URLs and common safe domains (the host itself or any subdomain)
+SAFE_URL_DOMAINS = ('etsy.com', 'etsystatic.com')
+SAFE_URL_SUFFIXES = tuple('.' + domain for domain in SAFE_URL_DOMAINS)
+
 def validate_username(username: str) -> tuple[bool, str]:
     """Validate username format"""
     if not username or len(username.strip()) < 3:
@@ -10,7 +21,7 @@ def validate_username(username: str) -> tuple[bool, str]:
     if len(username) > 50:
         return False, "Username must be less than 50 characters"
     
-    if not re.match(r'^[a-zA-Z0-9_-]+$', username):
+    if not USERNAME_PATTERN.match(username):
         return False, "Username can only contain letters, numbers, hyphens, and underscores"
     
     return True, "Valid username"
@@ -20,8 +31,7 @@ def validate_email(email: str) -> tuple[bool, str]:
     if not email:
         return True, "Email is optional"  # Email is optional
     
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
+    if not EMAIL_PATTERN.match(email):
         return False, "Invalid email format"
     
     if len(email) > 254:
@@ -47,14 +57,11 @@ def sanitize_text_input(text: str, max_length: int = 1000) -> str:
     if not text:
         return ""
     
-    # Remove HTML tags and escape special characters
-    sanitized = html.escape(text.strip())
-    
-    # Truncate if too long
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
+    # Truncate first so we never escape text we discard or cut an entity in half
+    sanitized = text.strip()[:max_length]
     
-    return sanitized
+    # Remove HTML tags and escape special characters
+    return html.escape(sanitized)
 
 def validate_search_terms(terms: List[str]) -> tuple[bool, str, List[str]]:
     """Validate and clean search terms"""
@@ -88,28 +95,43 @@ def validate_shop_names(shops: List[str]) -> tuple[bool, str, List[str]]:
     for shop in shops:
         if isinstance(shop, str):
             # Shop names should be alphanumeric with some special chars
-            clean_shop = re.sub(r'[^a-zA-Z0-9\s\-_]', '', shop.strip())
+            clean_shop = SHOP_NAME_INVALID_CHARS.sub('', shop.strip())
             if clean_shop and len(clean_shop) >= 2:
                 clean_shops.append(clean_shop[:50])  # Max shop name length
     
     return True, f"Validated {len(clean_shops)} shop names", clean_shops
 
+# Prices repeat heavily across listings, so reuse the formatted strings
+@lru_cache(maxsize=4096)
+def _format_currency(amount: float, currency: str) -> str:
+    """Format an amount for a currency (cached)"""
+    if currency == "GBP":
+        return f"£{amount:,.2f}"
+    elif currency == "USD":
+        return f"${amount:,.2f}"
+    elif currency == "EUR":
+        return f"€{amount:,.2f}"
+    else:
+        return f"{currency} {amount:,.2f}"
+
 def format_currency(amount: float, currency: str = "GBP") -> str:
     """Format currency consistently"""
     try:
-        if currency == "GBP":
-            return f"£{amount:,.2f}"
-        elif currency == "USD":
-            return f"${amount:,.2f}"
-        elif currency == "EUR":
-            return f"€{amount:,.2f}"
-        else:
-            return f"{currency} {amount:,.2f}"
+        # Unhashable arguments raise TypeError from the cache and fall back below
+        return _format_currency(amount, currency)
     except (ValueError, TypeError):
         return f"{currency} 0.00"
 
 def safe_int(value, default: int = 0) -> int:
     """Safely convert to integer"""
+    # Well-formed ints and integer strings skip the float round-trip
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        pass
+    
     try:
         return int(float(value))
     except (ValueError, TypeError):
@@ -117,6 +139,8 @@ def safe_int(value, default: int = 0) -> int:
 
 def safe_float(value, default: float = 0.0) -> float:
     """Safely convert to float"""
+    if type(value) is float:
+        return value
     try:
         return float(value)
     except (ValueError, TypeError):
@@ -133,11 +157,9 @@ def is_safe_url(url: str) -> bool:
     if not url:
         return False
     
-    # Allow Etsy URLs and common safe domains
-    safe_domains = [
-        'etsy.com',
-        'etsystatic.com',
-        'www.etsy.com'
-    ]
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return False
     
-    return any(domain in url.lower() for domain in safe_domains)
\ No newline at end of file
+    return host in SAFE_URL_DOMAINS or host.endswith(SAFE_URL_SUFFIXES)
\ No newline at end of file